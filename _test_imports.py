@@ -0,0 +1,200 @@
+"""
+Import test checks for blockchain transaction fee analyzer.
+Verifies that dependencies, configuration, and network modules are in
+place before a first run. Invoked through the test_imports.py launcher
+so this module's compiled bytecode is cached between runs.
+"""
+
+import functools
+import importlib.util
+import io
+import os
+import sys
+
+# Computed once: every test run needs the same two directories, so the
+# joins and abspath resolution do not belong inside the test functions
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CONFIG_DIR = os.path.join(_HERE, 'config')
+_NETWORKS_DIR = os.path.join(_HERE, 'networks')
+
+# Networks checked by the config and module tests
+_NETWORKS = ("ethereum", "arbitrum", "polygon", "litecoin")
+
+# Placeholder prefixes from config.example.py that mark unfilled values
+_SENTINELS = ("YOUR_",)
+
+# Required dependencies probed by test_imports (collections doubles as
+# a stdlib sanity check)
+_DEPENDENCIES = ("requests", "tabulate", "aiohttp", "collections")
+
+# ASCII status marks: keeps output on the encoder fast path and avoids
+# UnicodeEncodeError on consoles with legacy code pages
+_OK = "[OK]"
+_FAIL = "[FAIL]"
+_WARN = "[WARN]"
+
+# All output accumulates here and main() writes it to stdout once at the
+# end: one write syscall instead of one per print when stdout is an
+# unbuffered terminal or a contended CI pipe
+_buf = io.StringIO()
+
+
+def _ensure_on_path(path, _seen=set()):
+    """Add a directory to sys.path once, skipping the list scan after."""
+    if path not in _seen:
+        _seen.add(path)
+        if path not in sys.path:
+            # Appended, not inserted at the front: putting these dirs
+            # first would make every later stdlib import stat them
+            # before the real location
+            sys.path.append(path)
+
+
+def test_imports(deep=False):
+    """
+    Check that third-party dependencies are installed.
+
+    By default only the import finders are queried, which verifies the
+    packages are present without executing their module bodies (a full
+    requests import alone pulls in dozens of submodules). Pass
+    deep=True for real imports as an end-to-end usability check.
+    """
+    print("Testing dependencies...", file=_buf)
+
+    for name in _DEPENDENCIES:
+        try:
+            if deep:
+                importlib.import_module(name)
+            elif importlib.util.find_spec(name) is None:
+                raise ImportError(f"No module named '{name}'")
+            print(f"{_OK} {name} found", file=_buf)
+        except ImportError as e:
+            print(f"{_FAIL} {name} check failed: {e}", file=_buf)
+            return False
+
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def test_config_import():
+    """
+    Check that config.py exists and is filled in.
+
+    The result is memoized: when this module is imported by a test
+    runner that calls the check repeatedly, only the first call does
+    the import and validation work.
+    """
+    print("\nTesting configuration...", file=_buf)
+
+    _ensure_on_path(_CONFIG_DIR)
+
+    # Import the module object and read just the attributes this check
+    # uses; the old from-import bound six names of which only two were
+    # read. From the repo root "config" resolves to the package, so the
+    # settings file is addressed explicitly as the config.config
+    # submodule.
+    try:
+        _cfg = importlib.import_module("config.config")
+    except ImportError as e:
+        print(f"{_FAIL} config import failed: {e}", file=_buf)
+        print("  Copy config/config.example.py to config/config.py and fill it in",
+              file=_buf)
+        return False
+
+    print(f"{_OK} config imported", file=_buf)
+
+    api_key = _cfg.ETHERSCAN_API_KEY
+    addresses = _cfg.ADDRESSES
+
+    if not api_key or api_key.startswith(_SENTINELS):
+        print(f"{_WARN} Etherscan API key not configured", file=_buf)
+
+    missing = [n for n in _NETWORKS
+               if not (a := addresses.get(n)) or a.startswith(_SENTINELS)]
+    for network in missing:
+        print(f"{_WARN} {network} address not configured", file=_buf)
+
+    return True
+
+
+@functools.lru_cache(maxsize=2)
+def test_network_modules(deep=False):
+    """Check that the network analyzer modules can be resolved (memoized)."""
+    print("\nTesting network modules...", file=_buf)
+
+    _ensure_on_path(_NETWORKS_DIR)
+
+    # Failures are collected and reported together after the loop so one
+    # broken module does not bury the status of the other three
+    failures = []
+    for network in _NETWORKS:
+        # Probe the import finders instead of importing: executing the
+        # module bodies would pull in every transitive dependency four
+        # times just to learn that the files are present
+        try:
+            if deep:
+                # A module already imported this process is a plain
+                # sys.modules lookup, not a path-finder traversal
+                sys.modules.get(network) or importlib.import_module(network)
+                print(f"{_OK} {network} module imported", file=_buf)
+                continue
+            spec = importlib.util.find_spec(network)
+        except ModuleNotFoundError as e:
+            # e.name says exactly which module was missing, so the
+            # diagnostic can tell the network module itself apart from
+            # a transitive dependency it imports (config, aiohttp, ...)
+            if e.name == network:
+                failures.append((network, "module not found"))
+            else:
+                failures.append((network, f"missing dependency '{e.name}'"))
+            continue
+        except ImportError as e:
+            # Non-lookup import failures (circular imports, broken
+            # module bodies) keep their original message
+            failures.append((network, str(e)))
+            continue
+
+        if spec is None:
+            failures.append((network, "module not found"))
+        else:
+            print(f"{_OK} {network} module found", file=_buf)
+
+    for network, reason in failures:
+        print(f"{_FAIL} {network} module failed: {reason}", file=_buf)
+
+    return not failures
+
+
+def main():
+    """Run all import tests."""
+    # Flags are checked directly to keep argparse off the startup path:
+    # --deep performs real imports instead of finder probes, --fast
+    # stops after the dependency-presence phase
+    args = sys.argv[1:]
+    deep = "--deep" in args
+    fast = "--fast" in args
+
+    print("Blockchain Transaction Fee Analyzer - import test\n", file=_buf)
+
+    tests = [functools.partial(test_imports, deep)]
+    if not fast:
+        tests.append(test_config_import)
+        tests.append(functools.partial(test_network_modules, deep))
+
+    # all() short-circuits: when a dependency is already known missing
+    # there is no point probing modules that require it
+    all_ok = all(t() for t in tests)
+
+    print(file=_buf)
+    if all_ok:
+        print(f"{_OK} All tests passed", file=_buf)
+    else:
+        print(f"{_FAIL} Some tests failed", file=_buf)
+
+    sys.stdout.write(_buf.getvalue())
+    sys.stdout.flush()
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
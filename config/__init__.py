@@ -1,2 +1,14 @@
 # Config package
-
+#
+# Re-exports the settings from config.py so "from config import ..."
+# resolves the same names whether "config" is found as this package
+# (running main.py from the repo root) or as the config.py module
+# itself (running a network script, which appends this directory to
+# sys.path).
+try:
+    from .config import *  # noqa: F401,F403
+except ImportError:
+    # config.py has not been created from config.example.py yet; the
+    # importing module will raise its usual "cannot import name" error
+    # with instructions from the caller.
+    pass
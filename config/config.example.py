@@ -42,7 +42,10 @@ TOKENS = {
 # Analysis settings
 SETTINGS = {
     "max_my_transactions": 10,
-    "max_network_examples": 20
+    "max_network_examples": 20,
+    # Treat each transaction's gas limit as its gas used (fee upper
+    # bound) and skip all receipt lookups - much faster, less precise
+    "use_gas_limit_as_fee_proxy": False
 }
 
 # Network chain IDs
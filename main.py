@@ -0,0 +1,40 @@
+"""
+Blockchain Transaction Fee Analyzer - multi-chain runner
+
+Runs the Ethereum, Arbitrum and Polygon analyzers concurrently in one
+event loop. The analyzers share the Etherscan rate-limit bucket, the
+request semaphore and the on-disk cache, so the whole sweep finishes in
+roughly the time of the slowest chain instead of the sum of all three.
+
+Litecoin uses a different explorer API and is run separately:
+    python networks/litecoin.py
+"""
+
+import asyncio
+import os
+import sys
+
+# Add networks to path (the modules are written to run as scripts)
+sys.path.append(os.path.join(os.path.dirname(__file__), 'networks'))
+
+import arbitrum
+import ethereum
+import polygon
+
+
+async def main_async():
+    """Run every EVM network analyzer concurrently."""
+    await asyncio.gather(
+        ethereum.analyzer.run(),
+        arbitrum.analyzer.run(),
+        polygon.analyzer.run()
+    )
+
+
+def main():
+    """Main execution function."""
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1290 @@
+"""
+Shared analyzer for EVM-compatible networks.
+
+Ethereum, Arbitrum and Polygon all speak the same Etherscan API and
+differ only in configuration (endpoint, chain id, address, tokens), so
+the collection and analysis pipeline lives here once as EVMAnalyzer.
+The per-network modules just bind it to their configuration.
+
+The rate-limit bucket, the request semaphore and the on-disk cache are
+module-level and therefore shared across every analyzer instance in the
+process: the Etherscan limit applies per API key, not per chain, and
+the cache keys every row by chain id.
+"""
+
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from collections import deque
+from tabulate import tabulate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+log_dir = os.path.join(os.path.dirname(__file__), '..', 'results')
+os.makedirs(log_dir, exist_ok=True)
+
+# Maximum number of JSON-RPC calls bundled into one batch request
+RECEIPT_BATCH_SIZE = 10
+
+# Etherscan allows 5 requests per second; cap in-flight requests at that
+REQUEST_CONCURRENCY = 5
+
+# Requests admitted per second by the token bucket
+RATE_LIMIT_PER_SEC = 5
+
+# Retries (with exponential backoff) when the API reports rate limiting
+MAX_RETRIES = 3
+
+# Blocks within this distance of the chain head may still reorg; only
+# blocks at least this deep are cached on disk
+REORG_SAFETY_DEPTH = 64
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# ERC-20 transfer(address,uint256) function selector
+TRANSFER_SELECTOR = "0xa9059cbb"
+
+# Finalized blocks and mined receipts are immutable, so repeat runs can
+# read them from disk instead of re-fetching from the API
+CACHE_FILE = os.path.join(log_dir, 'cache.sqlite')
+_cache_conn = sqlite3.connect(CACHE_FILE)
+_cache_conn.execute(
+    "CREATE TABLE IF NOT EXISTS blocks (chain_id INTEGER, number INTEGER, json TEXT, "
+    "PRIMARY KEY (chain_id, number))")
+_cache_conn.execute(
+    "CREATE TABLE IF NOT EXISTS receipts (chain_id INTEGER, hash TEXT, json TEXT, "
+    "PRIMARY KEY (chain_id, hash))")
+_cache_conn.commit()
+
+
+# In-memory front for the sqlite cache: within a run the same tx hash
+# can be looked up several times across token loops, and this keeps
+# those repeats off both the network and the disk
+_memory_cache = {}
+
+
+def _cache_get(chain_id, table, key_column, key):
+    """Look up a cached JSON payload for a chain, or None on miss."""
+    mem_key = (chain_id, table, key)
+    if mem_key in _memory_cache:
+        return _memory_cache[mem_key]
+
+    row = _cache_conn.execute(
+        f"SELECT json FROM {table} WHERE chain_id = ? AND {key_column} = ?",
+        (chain_id, key)).fetchone()
+    if row is None:
+        return None
+
+    value = json.loads(row[0])
+    _memory_cache[mem_key] = value
+    return value
+
+
+def _cache_put(chain_id, table, key_column, key, value):
+    """Store a JSON payload in the on-disk cache for a chain."""
+    _memory_cache[(chain_id, table, key)] = value
+    _cache_conn.execute(
+        f"INSERT OR REPLACE INTO {table} (chain_id, {key_column}, json) VALUES (?, ?, ?)",
+        (chain_id, key, json.dumps(value)))
+    _cache_conn.commit()
+
+
+# Per-address token activity decisions persisted between runs: tokens
+# that had no history last time are skipped entirely on later runs and
+# only re-probed once the decision has aged out
+ADDRESS_TOKENS_FILE = os.path.join(log_dir, 'address_tokens.json')
+TOKEN_DECISION_TTL = 24 * 3600
+
+
+def _load_token_decisions():
+    """Read the persisted token activity decisions, or an empty dict."""
+    try:
+        with open(ADDRESS_TOKENS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_token_decisions(decisions):
+    """Persist the token activity decisions; best effort."""
+    try:
+        _write_json(ADDRESS_TOKENS_FILE, decisions)
+    except OSError:
+        pass
+
+
+_token_decisions = _load_token_decisions()
+
+
+# Reciprocal unit factors: multiplying by these is cheaper than
+# re-evaluating 10**18 / 10**9 and dividing on every formatted cell
+_ETH_PER_WEI = 1e-18
+_GWEI_PER_WEI = 1e-9
+
+
+def wei_to_native(wei_value):
+    """
+    Convert a wei value to the native coin unit (ETH, POL, ...).
+
+    Args:
+        wei_value (int): Value in wei (smallest unit, 1 coin = 10^18 wei)
+
+    Returns:
+        float: Value in the native coin unit
+    """
+    return wei_value * _ETH_PER_WEI
+
+
+def _hex_int(x):
+    """Parse a hex string field into an int, passing ints through."""
+    return int(x, 16) if isinstance(x, str) else (x or 0)
+
+
+def _loads(raw):
+    """Decode a JSON payload, preferring orjson's C parser."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# Output keys holding the large per-transaction arrays; these are
+# streamed row by row rather than serialized as one buffer
+_STREAMED_KEYS = ("my_transactions", "network_transfers")
+
+
+def _dumps_value(value):
+    """
+    Encode one value with orjson, with a stdlib escape hatch.
+
+    orjson rejects integers outside the 64-bit range with a TypeError,
+    but exact wei fees can exceed 2**63 during gas spikes; those rare
+    values are re-encoded with the stdlib encoder, which has no such
+    limit.
+    """
+    try:
+        return orjson.dumps(value)
+    except TypeError:
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _write_json(path, data):
+    """
+    Serialize data to a JSON file without building one giant buffer.
+
+    The transaction arrays dominate the output size, so they are
+    written one orjson-encoded row at a time; the stdlib fallback
+    drives the encoder through iterencode for the same effect. Peak
+    memory for the write phase stays at one row instead of the whole
+    document.
+
+    The file is written to a temporary name and atomically renamed into
+    place, so an interrupted run never leaves a truncated results file.
+    """
+    tmp_path = path + '.tmp'
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(b"{")
+            for key_index, (key, value) in enumerate(data.items()):
+                if key_index:
+                    f.write(b",")
+                f.write(orjson.dumps(key) + b":")
+                if key in _STREAMED_KEYS and isinstance(value, list):
+                    f.write(b"[")
+                    for row_index, row in enumerate(value):
+                        if row_index:
+                            f.write(b",")
+                        f.write(_dumps_value(row))
+                    f.write(b"]")
+                else:
+                    f.write(_dumps_value(value))
+            f.write(b"}")
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in json.JSONEncoder(ensure_ascii=False).iterencode(data):
+                f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def _finish_records(tokens, hashes, blocks, gas_used, gas_price, gas_limit):
+    """
+    Turn parallel per-field columns into transaction dict records.
+
+    The collectors accumulate plain int columns (structure-of-arrays)
+    instead of one dict per transaction; fees for the whole batch are
+    computed here in one pass, and the columns are zipped back into the
+    dict layout only at this interface boundary for the JSON output and
+    report. The fee multiply stays in Python-int arithmetic: gas_used *
+    gas_price in wei can exceed 2**63 during gas spikes, where an int64
+    multiply would wrap silently.
+
+    Args:
+        tokens (list): Token name per transaction
+        hashes (list): Transaction hash per transaction
+        blocks (list): Block number per transaction
+        gas_used (list): Gas used per transaction
+        gas_price (list): Gas price per transaction
+        gas_limit (list): Gas limit per transaction
+
+    Returns:
+        list: Transaction dicts with token, hash, block, gas fields, and fee
+    """
+    fees = [gu * gp for gu, gp in zip(gas_used, gas_price)]
+
+    return [
+        {
+            "token": token,
+            "hash": tx_hash,
+            "block": block,
+            "gas_used": gu,
+            "gas_price": gp,
+            "gas_limit": gl,
+            "fee": fee
+        }
+        for token, tx_hash, block, gu, gp, gl, fee
+        in zip(tokens, hashes, blocks, gas_used, gas_price, gas_limit, fees)
+    ]
+
+
+class RateLimiter:
+    """
+    Minimal async token bucket.
+
+    Admits at most `rate` acquisitions per `period` seconds and only
+    makes callers sleep when the bucket is actually exhausted, so the
+    pipeline runs at the allowed maximum instead of pacing every call
+    with a fixed sleep.
+    """
+
+    def __init__(self, rate, period=1.0):
+        self._rate = rate
+        self._period = period
+        self._stamps = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be issued under the rate limit."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            while self._stamps and now - self._stamps[0] >= self._period:
+                self._stamps.popleft()
+
+            if len(self._stamps) >= self._rate:
+                await asyncio.sleep(self._period - (now - self._stamps[0]))
+                now = loop.time()
+                while self._stamps and now - self._stamps[0] >= self._period:
+                    self._stamps.popleft()
+
+            self._stamps.append(now)
+
+
+# Shared across all analyzers: the Etherscan rate limit is per API key,
+# so concurrent chains must draw from one bucket and one semaphore
+_rate_limiter = RateLimiter(RATE_LIMIT_PER_SEC)
+_request_sem = asyncio.Semaphore(REQUEST_CONCURRENCY)
+
+
+def _is_rate_limit_reply(data):
+    """Check whether a decoded API body reports the per-second limit."""
+    return (isinstance(data, dict) and
+            "max calls per sec" in str(data.get("result", "")).lower())
+
+
+def is_native_transfer(tx):
+    """
+    Check if a transaction is a plain native coin transfer.
+
+    Args:
+        tx (dict): Transaction data from API
+
+    Returns:
+        bool: True if the transaction moves the native coin with no calldata
+    """
+    return (tx.get("to") and
+            int(tx.get("value", "0"), 0) > 0 and
+            (tx.get("input") == "0x" or tx.get("input") == ""))
+
+
+GAS_FIELDS = ("gas_used", "gas_price", "gas_limit", "fee")
+
+
+def _aggregate_stats_vectorized(transactions):
+    """
+    Aggregate per-token statistics with a pandas groupby.
+
+    The sums and means run as vectorized reductions over contiguous
+    columns instead of per-row Python arithmetic; the result is
+    converted back to the plain dict layout at the boundary.
+
+    Args:
+        transactions (list): Transaction dicts with token and gas fields
+
+    Returns:
+        dict: Per-token statistics with totals, count, and averages
+    """
+    stats = {}
+    if not transactions:
+        return stats
+
+    df = pd.DataFrame(transactions)
+    # The gas columns are reduced as float64: wei fees and their sums can
+    # exceed 2**63, where the default int64 reduction would wrap silently,
+    # while float64 rounding sits far below the report's display resolution
+    df[list(GAS_FIELDS)] = df[list(GAS_FIELDS)].astype("float64")
+    grouped = df.groupby("token")[list(GAS_FIELDS)].agg(["sum", "mean", "count"])
+
+    for token in grouped.index:
+        token_stats = {"count": int(grouped.loc[token, ("gas_used", "count")])}
+        for field in GAS_FIELDS:
+            token_stats[f"total_{field}"] = int(grouped.loc[token, (field, "sum")])
+            token_stats[f"avg_{field}"] = float(grouped.loc[token, (field, "mean")])
+        stats[token] = token_stats
+
+    return stats
+
+
+class _Stat:
+    """Accumulator bucket for one token's gas statistics."""
+
+    __slots__ = ("count", "gas_used", "gas_price", "gas_limit", "fee")
+
+    def __init__(self):
+        self.count = 0
+        self.gas_used = 0
+        self.gas_price = 0
+        self.gas_limit = 0
+        self.fee = 0
+
+
+def _aggregate_stats_python(transactions):
+    """
+    Aggregate per-token statistics in pure Python.
+
+    Fallback used when pandas is not installed. A slotted accumulator
+    object per token keeps the per-transaction work to five attribute
+    adds in a single pass; averages are derived once at the end.
+
+    Args:
+        transactions (list): Transaction dicts with token and gas fields
+
+    Returns:
+        dict: Per-token statistics with totals, count, and averages
+    """
+    buckets = {}
+
+    for tx in transactions:
+        s = buckets.get(tx["token"])
+        if s is None:
+            s = buckets[tx["token"]] = _Stat()
+        s.count += 1
+        s.gas_used += tx["gas_used"]
+        s.gas_price += tx["gas_price"]
+        s.gas_limit += tx["gas_limit"]
+        s.fee += tx["fee"]
+
+    return {
+        token: {
+            "count": s.count,
+            "total_gas_used": s.gas_used,
+            "total_gas_price": s.gas_price,
+            "total_gas_limit": s.gas_limit,
+            "total_fee": s.fee,
+            "avg_gas_used": s.gas_used / s.count,
+            "avg_gas_price": s.gas_price / s.count,
+            "avg_gas_limit": s.gas_limit / s.count,
+            "avg_fee": s.fee / s.count
+        }
+        for token, s in buckets.items()
+    }
+
+
+def analyze_data(data):
+    """
+    Analyze collected transaction data and calculate statistics.
+
+    Computes averages for gas used, gas price, gas limit, and fees
+    for both user transactions and network transactions.
+
+    Args:
+        data (dict): Collected data with 'my_transactions' and 'network_transfers' keys
+
+    Returns:
+        tuple: (my_stats dict, network_stats dict)
+            Each stats dict contains per-token statistics with averages
+    """
+    aggregate = _aggregate_stats_vectorized if pd is not None else _aggregate_stats_python
+    return aggregate(data["my_transactions"]), aggregate(data["network_transfers"])
+
+
+class EVMAnalyzer:
+    """
+    Transaction fee analyzer for one EVM-compatible network.
+
+    Holds the network configuration and implements the full pipeline:
+    collecting the user's transactions, gathering comparable network
+    transfers, aggregating statistics, and writing the report. Multiple
+    instances can run concurrently in one event loop and will share the
+    module-level rate limiter, semaphore and cache.
+
+    Args:
+        network (str): Config key and results file prefix (e.g. "arbitrum")
+        display_name (str): Human-readable network name for the report
+        api_key (str): Etherscan API key
+        chain_id (int): Chain id, used for cache keys and API v2 requests
+        base_url (str): Etherscan API endpoint for this network
+        my_address (str): Wallet address whose fees are analyzed
+        tokens (dict): Token name to contract address for this network
+        settings (dict): Analysis settings from the config
+    """
+
+    def __init__(self, network, display_name, api_key, chain_id, base_url,
+                 my_address, tokens, settings):
+        self.network = network
+        self.display_name = display_name
+        self.api_key = api_key
+        self.chain_id = chain_id
+        self.base_url = base_url
+        self.my_address = my_address
+        self.tokens = tokens
+        self.max_my_transactions = settings["max_my_transactions"]
+        self.max_network_examples = settings["max_network_examples"]
+        self.use_gas_limit_as_fee_proxy = settings.get("use_gas_limit_as_fee_proxy", False)
+
+        # Etherscan v1 endpoints predate the chainid parameter; only v2
+        # requests carry it (api_request drops None-valued params)
+        self._chainid_param = chain_id if "/v2/" in base_url else None
+
+        # Lowercased once at construction so the per-transaction scan
+        # never has to re-lowercase these constants
+        self._my_address_lower = my_address.lower()
+        self._tokens_lower = {name: addr.lower() for name, addr in tokens.items()}
+        self.token_display_names = {name: name.upper() for name in tokens}
+        self._native_token = next(
+            (name for name, addr in self._tokens_lower.items() if addr == ZERO_ADDRESS),
+            None)
+        # Native coin ticker for the report's fee columns
+        self.currency = (self.token_display_names.get(self._native_token, "ETH")
+                         if self._native_token else "ETH")
+
+        self._safe_block_cutoff = None
+
+        # Per-network log file alongside the results, plus the console
+        self.log = logging.getLogger(f"fee_analyzer.{network}")
+        if not self.log.handlers:
+            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            for handler in (logging.FileHandler(os.path.join(log_dir, f'{network}.log')),
+                            logging.StreamHandler()):
+                handler.setFormatter(formatter)
+                self.log.addHandler(handler)
+            self.log.setLevel(logging.INFO)
+            self.log.propagate = False
+
+    async def api_request(self, session, params, json_payload=None):
+        """
+        Perform a rate-limited request against the Etherscan API.
+
+        Requests pass through the shared token bucket, and rate-limit
+        responses (HTTP 429 or Etherscan's "Max calls per sec" body) are
+        retried with exponential backoff.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            params (dict): Query parameters; None values are dropped
+            json_payload (list, optional): JSON-RPC batch body; when given
+                the call is issued as a POST
+
+        Returns:
+            dict or list: Decoded JSON response body
+
+        Raises:
+            RuntimeError: If the API keeps rate limiting after all retries
+        """
+        params = {k: v for k, v in params.items() if v is not None}
+        method = "POST" if json_payload is not None else "GET"
+
+        for attempt in range(MAX_RETRIES + 1):
+            await _rate_limiter.acquire()
+            async with _request_sem:
+                async with session.request(method, self.base_url, params=params,
+                                           json=json_payload,
+                                           timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    if response.status != 429:
+                        response.raise_for_status()
+                        data = _loads(await response.read())
+                        if not _is_rate_limit_reply(data):
+                            return data
+
+            if attempt < MAX_RETRIES:
+                backoff = 2 ** attempt
+                self.log.warning(f"API rate limit hit, retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+
+        raise RuntimeError("Etherscan rate limit persisted after retries")
+
+    async def get_transactions(self, session, address, contract_address=None, limit=5):
+        """
+        Get a transaction list using the Etherscan account module.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            address (str): Wallet address to get transactions for
+            contract_address (str, optional): Token contract address.
+                If None or zero address, returns native coin transactions.
+                If provided, returns ERC-20 token transactions.
+            limit (int): Maximum number of transactions to retrieve
+
+        Returns:
+            list: List of transaction dictionaries (empty on a confirmed
+                "No transactions found" reply), or None on error
+        """
+        action = "tokentx" if contract_address and contract_address != ZERO_ADDRESS else "txlist"
+
+        params = {
+            "chainid": self._chainid_param,
+            "module": "account",
+            "action": action,
+            "address": address,
+            "contractaddress": contract_address,
+            "page": 1,
+            "offset": limit,
+            "sort": "desc",
+            "apikey": self.api_key
+        }
+
+        try:
+            data = await self.api_request(session, params)
+
+            if data["status"] == "1":
+                self.log.info(f"Retrieved {len(data['result'])} transactions for "
+                              f"{contract_address or self.currency}")
+                return data["result"]
+
+            # Etherscan reports a legitimately empty history as status 0
+            # with this message; only that case is a confirmed empty list,
+            # everything else (bad key, rate limit, ...) is an error
+            message = data.get("message", "Unknown error")
+            if "no transactions found" in message.lower():
+                return []
+            self.log.warning(f"API returned status 0: {message}")
+            return None
+        except Exception as e:
+            self.log.error(f"Error retrieving transactions: {str(e)}")
+            return None
+
+    async def get_safe_block_cutoff(self, session):
+        """
+        Get the highest block number considered safe to cache.
+
+        Fetched once per run: the current chain head minus REORG_SAFETY_DEPTH.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+
+        Returns:
+            int: Highest cache-safe block number, or 0 if the head is unknown
+        """
+        if self._safe_block_cutoff is None:
+            params = {
+                "chainid": self._chainid_param,
+                "module": "proxy",
+                "action": "eth_blockNumber",
+                "apikey": self.api_key
+            }
+            try:
+                data = await self.api_request(session, params)
+                latest = int(data.get("result", "0x0"), 16)
+                self._safe_block_cutoff = max(0, latest - REORG_SAFETY_DEPTH)
+            except Exception as e:
+                self.log.error(f"Error retrieving latest block number: {str(e)}")
+                self._safe_block_cutoff = 0
+        return self._safe_block_cutoff
+
+    async def get_token_transfers(self, session, contract_address, start_block, end_block):
+        """
+        Get all transfers of a token within a block range.
+
+        Uses the tokentx endpoint, whose rows already carry gasUsed and
+        gasPrice, so network examples for a token cost one request per
+        token instead of per-block scans plus per-transaction receipts.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            contract_address (str): Token contract address
+            start_block (int): First block of the range (inclusive)
+            end_block (int): Last block of the range (inclusive)
+
+        Returns:
+            list: List of transfer dictionaries, or empty list on error
+        """
+        params = {
+            "chainid": self._chainid_param,
+            "module": "account",
+            "action": "tokentx",
+            "contractaddress": contract_address,
+            "startblock": start_block,
+            "endblock": end_block,
+            "page": 1,
+            "offset": 10000,
+            "sort": "asc",
+            "apikey": self.api_key
+        }
+
+        try:
+            data = await self.api_request(session, params)
+
+            if data["status"] == "1":
+                return data["result"]
+            else:
+                self.log.warning(f"API returned status 0: {data.get('message', 'Unknown error')}")
+                return []
+        except Exception as e:
+            self.log.error(f"Error retrieving token transfers: {str(e)}")
+            return []
+
+    async def get_block_transactions(self, session, block_number):
+        """
+        Get all transactions in a specific block.
+
+        Finalized blocks are served from the on-disk cache; blocks close to
+        the chain head are fetched fresh and not cached.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            block_number (int): Block number to retrieve transactions from
+
+        Returns:
+            list: List of transaction dictionaries in the block, or empty list on error
+        """
+        cached = _cache_get(self.chain_id, "blocks", "number", block_number)
+        if cached is not None:
+            return cached
+
+        params = {
+            "chainid": self._chainid_param,
+            "module": "proxy",
+            "action": "eth_getBlockByNumber",
+            "tag": hex(block_number),
+            "boolean": "true",
+            "apikey": self.api_key
+        }
+
+        try:
+            data = await self.api_request(session, params)
+            transactions = data.get("result", {}).get("transactions", [])
+            if transactions and block_number <= await self.get_safe_block_cutoff(session):
+                _cache_put(self.chain_id, "blocks", "number", block_number, transactions)
+            return transactions
+        except Exception as e:
+            self.log.error(f"Error retrieving block {block_number}: {str(e)}")
+            return []
+
+    async def get_blocks_batch(self, session, block_numbers):
+        """
+        Prefetch many blocks with batched JSON-RPC requests.
+
+        Posts JSON-RPC arrays of eth_getBlockByNumber calls (chunked to
+        RECEIPT_BATCH_SIZE per request) so the whole block list is resolved
+        before analysis starts, instead of one serial round trip per block.
+        Cached finalized blocks are served from disk.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            block_numbers (list): Block numbers to prefetch
+
+        Returns:
+            dict: Mapping of block number to its transaction list; blocks
+                that could not be retrieved are absent
+        """
+        blocks_cache = {}
+        misses = []
+
+        for block_number in block_numbers:
+            cached = _cache_get(self.chain_id, "blocks", "number", block_number)
+            if cached is not None:
+                blocks_cache[block_number] = cached
+            else:
+                misses.append(block_number)
+
+        if not misses:
+            return blocks_cache
+
+        safe_cutoff = await self.get_safe_block_cutoff(session)
+
+        for start in range(0, len(misses), RECEIPT_BATCH_SIZE):
+            chunk = misses[start:start + RECEIPT_BATCH_SIZE]
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": "eth_getBlockByNumber", "params": [hex(block_number), True]}
+                for i, block_number in enumerate(chunk)
+            ]
+
+            try:
+                data = await self.api_request(session,
+                                              {"chainid": self._chainid_param, "apikey": self.api_key},
+                                              json_payload=payload)
+
+                if not isinstance(data, list):
+                    # HTTP 200 with an error object instead of a batch
+                    # array (e.g. batch requests rejected by the endpoint)
+                    raise ValueError(f"expected batch array, got: {str(data)[:120]}")
+
+                for item in data:
+                    result = item.get("result")
+                    item_id = item.get("id")
+                    if result and isinstance(item_id, int) and 0 <= item_id < len(chunk):
+                        block_number = chunk[item_id]
+                        transactions = result.get("transactions", [])
+                        blocks_cache[block_number] = transactions
+                        if transactions and block_number <= safe_cutoff:
+                            _cache_put(self.chain_id, "blocks", "number", block_number, transactions)
+            except Exception as e:
+                self.log.error(f"Error retrieving block batch ({len(chunk)} blocks): {str(e)}")
+
+            # Individual lookups for whatever the batch did not deliver
+            # (failed batch, error reply, or result-less items), so one
+            # bad batch does not drop every block in the chunk
+            missing = [b for b in chunk if b not in blocks_cache]
+            if missing:
+                fallbacks = await asyncio.gather(*[
+                    self.get_block_transactions(session, block_number) for block_number in missing
+                ])
+                for block_number, transactions in zip(missing, fallbacks):
+                    blocks_cache[block_number] = transactions
+
+        return blocks_cache
+
+    async def get_transaction_receipt(self, session, tx_hash):
+        """
+        Get transaction receipt containing execution details (gas used, status, etc.).
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            tx_hash (str): Transaction hash (0x-prefixed hex string)
+
+        Returns:
+            dict: Transaction receipt with gas information, or None on error
+        """
+        cached = _cache_get(self.chain_id, "receipts", "hash", tx_hash)
+        if cached is not None:
+            return cached
+
+        params = {
+            "chainid": self._chainid_param,
+            "module": "proxy",
+            "action": "eth_getTransactionReceipt",
+            "txhash": tx_hash,
+            "apikey": self.api_key
+        }
+
+        try:
+            data = await self.api_request(session, params)
+            receipt = data.get("result")
+            if receipt:
+                _cache_put(self.chain_id, "receipts", "hash", tx_hash, receipt)
+            return receipt
+        except Exception as e:
+            self.log.error(f"Error retrieving receipt {tx_hash}: {str(e)}")
+            return None
+
+    async def get_transaction_receipts_batch(self, session, tx_hashes):
+        """
+        Get receipts for many transactions with batched JSON-RPC requests.
+
+        Posts a JSON-RPC array to the Etherscan proxy endpoint so a whole
+        group of receipts travels in one HTTP round trip instead of one
+        request per transaction. Hashes are chunked to stay within the
+        endpoint's batch size limits.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            tx_hashes (list): Transaction hashes (0x-prefixed hex strings)
+
+        Returns:
+            dict: Mapping of tx_hash to receipt dict; hashes whose receipt
+                could not be retrieved are absent
+        """
+        receipts = {}
+        misses = []
+
+        for tx_hash in tx_hashes:
+            cached = _cache_get(self.chain_id, "receipts", "hash", tx_hash)
+            if cached is not None:
+                receipts[tx_hash] = cached
+            else:
+                misses.append(tx_hash)
+
+        for start in range(0, len(misses), RECEIPT_BATCH_SIZE):
+            chunk = misses[start:start + RECEIPT_BATCH_SIZE]
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": "proxy_eth_getTransactionReceipt", "params": [tx_hash]}
+                for i, tx_hash in enumerate(chunk)
+            ]
+
+            try:
+                data = await self.api_request(session,
+                                              {"chainid": self._chainid_param, "apikey": self.api_key},
+                                              json_payload=payload)
+
+                if not isinstance(data, list):
+                    # HTTP 200 with an error object instead of a batch
+                    # array (e.g. batch requests rejected by the endpoint)
+                    raise ValueError(f"expected batch array, got: {str(data)[:120]}")
+
+                for item in data:
+                    result = item.get("result")
+                    item_id = item.get("id")
+                    if result and isinstance(item_id, int) and 0 <= item_id < len(chunk):
+                        receipts[chunk[item_id]] = result
+                        _cache_put(self.chain_id, "receipts", "hash", chunk[item_id], result)
+            except Exception as e:
+                self.log.error(f"Error retrieving receipt batch ({len(chunk)} hashes): {str(e)}")
+
+            # Individual lookups for whatever the batch did not deliver
+            # (failed batch, error reply, or result-less items), so one
+            # bad batch does not drop every receipt in the chunk
+            missing = [h for h in chunk if h not in receipts]
+            if missing:
+                fallbacks = await asyncio.gather(*[
+                    self.get_transaction_receipt(session, tx_hash) for tx_hash in missing
+                ])
+                for tx_hash, receipt in zip(missing, fallbacks):
+                    if receipt:
+                        receipts[tx_hash] = receipt
+
+        return receipts
+
+    async def collect_my_transactions(self, session):
+        """
+        Collect the user's recent transactions from the network.
+
+        Fires one request per configured token concurrently (bounded by the
+        shared semaphore) and collects block numbers for later network
+        analysis.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+
+        Returns:
+            tuple: (list of transaction dicts, list of block numbers)
+                - Transaction dicts contain: token, hash, block, gas_used, gas_price, gas_limit, fee
+                - Block numbers are used to analyze network transactions in same blocks
+        """
+        self.log.info(f"Collecting user transactions from {self.display_name}...")
+        blocks_to_analyze = set()
+
+        # Skip tokens this address had no history for on a recent run;
+        # the decision is re-probed once it ages past the TTL
+        decision_key = f"{self.chain_id}:{self._my_address_lower}"
+        decisions = _token_decisions.setdefault(decision_key, {})
+        now = time.time()
+
+        active_tokens = []
+        for token_name, token_address in self.tokens.items():
+            entry = decisions.get(token_name)
+            if (entry and not entry["active"] and
+                    now - entry["checked"] < TOKEN_DECISION_TTL):
+                self.log.info(f"Skipping {token_name}: no activity for this address (cached)")
+                continue
+            active_tokens.append((token_name, token_address))
+
+        token_txs = await asyncio.gather(*[
+            self.get_transactions(session, self.my_address,
+                                  None if self._tokens_lower[token_name] == ZERO_ADDRESS
+                                  else token_address,
+                                  self.max_my_transactions)
+            for token_name, token_address in active_tokens
+        ])
+
+        for (token_name, _), txs in zip(active_tokens, token_txs):
+            # None means the lookup failed (timeout, rate limit, ...);
+            # only a confirmed reply may update the activity decision,
+            # or one transient error would mute the token for a full TTL
+            if txs is not None:
+                decisions[token_name] = {"active": bool(txs), "checked": now}
+        _save_token_decisions(_token_decisions)
+
+        # Parallel per-field columns instead of one dict per transaction
+        col_token, col_hash, col_block = [], [], []
+        col_gas_used, col_gas_price, col_gas_limit = [], [], []
+
+        for (token_name, _), txs in zip(active_tokens, token_txs):
+            for tx in txs or ():
+                block_number = int(tx.get("blockNumber", "0"))
+                if block_number > 0:
+                    col_token.append(token_name)
+                    col_hash.append(tx.get("hash", ""))
+                    col_block.append(block_number)
+                    col_gas_used.append(int(tx.get("gasUsed", "0")))
+                    col_gas_price.append(int(tx.get("gasPrice", "0")))
+                    col_gas_limit.append(int(tx.get("gas", "0")))
+                    blocks_to_analyze.add(block_number)
+
+        my_transactions = _finish_records(col_token, col_hash, col_block,
+                                          col_gas_used, col_gas_price, col_gas_limit)
+
+        self.log.info(f"Collected {len(my_transactions)} user transactions "
+                      f"in {len(blocks_to_analyze)} blocks")
+        return my_transactions, list(blocks_to_analyze)
+
+    async def process_block(self, session, block, txs_in_block, addr_to_token, native_token):
+        """
+        Find token transfers in a single block and resolve their receipts.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            block (int): Block number to analyze
+            txs_in_block (list): Prefetched transactions of the block
+            addr_to_token (dict): Lowercased contract address to token name
+            native_token (str): Name of the native token to match, or None
+
+        Returns:
+            list: Transfer dicts found in this block
+        """
+        self.log.info(f"Found {len(txs_in_block)} transactions in block {block}")
+
+        token_counters = dict.fromkeys(addr_to_token.values(), 0)
+        if native_token is not None:
+            token_counters[native_token] = 0
+        pending_transfers = []
+        # Once every token has max_network_examples candidates there is
+        # nothing left to find, so stop scanning the rest of the block.
+        unsaturated = len(token_counters)
+
+        for tx_index, tx in enumerate(txs_in_block):
+            tx_hash = tx.get('hash', 'N/A')
+            sender = tx.get("from", "")
+            if sender == self._my_address_lower or sender.lower() == self._my_address_lower:
+                continue
+
+            to = tx.get("to")
+            if not to:
+                continue
+
+            # Etherscan returns lowercase hex addresses, so the raw string
+            # almost always hits; only allocate a lowercased copy on a miss
+            token_name = addr_to_token.get(to)
+            if token_name is None and not to.islower():
+                token_name = addr_to_token.get(to.lower())
+            if token_name is not None:
+                if (token_counters[token_name] < self.max_network_examples and
+                        tx.get("input", "").startswith(TRANSFER_SELECTOR)):
+                    pending_transfers.append((token_name, tx, tx_hash))
+                    token_counters[token_name] += 1
+                    if token_counters[token_name] == self.max_network_examples:
+                        unsaturated -= 1
+                        if unsaturated == 0:
+                            break
+            elif (native_token is not None and
+                    token_counters[native_token] < self.max_network_examples and
+                    is_native_transfer(tx)):
+                pending_transfers.append((native_token, tx, tx_hash))
+                token_counters[native_token] += 1
+                if token_counters[native_token] == self.max_network_examples:
+                    unsaturated -= 1
+                    if unsaturated == 0:
+                        break
+
+        if self.use_gas_limit_as_fee_proxy:
+            # The block payload already carries each tx's gas limit and gas
+            # price; treating the limit as gas used gives a fee upper bound
+            # without any receipt round trips.
+            receipts = {}
+        else:
+            # Resolve every candidate receipt for the block in one batched
+            # call instead of one HTTP round trip per transaction.
+            receipts = await self.get_transaction_receipts_batch(
+                session, [tx_hash for _, _, tx_hash in pending_transfers])
+
+        # Parallel per-field columns instead of one dict per transfer
+        col_token, col_hash, col_block = [], [], []
+        col_gas_used, col_gas_price, col_gas_limit = [], [], []
+
+        for token_name, tx, tx_hash in pending_transfers:
+            gas_price = _hex_int(tx.get("gasPrice"))
+            gas_limit = _hex_int(tx.get("gas"))
+
+            if self.use_gas_limit_as_fee_proxy:
+                gas_used = gas_limit
+            else:
+                receipt = receipts.get(tx_hash)
+                if not receipt:
+                    continue
+                gas_used = _hex_int(receipt.get("gasUsed"))
+
+            col_token.append(token_name)
+            col_hash.append(tx_hash)
+            col_block.append(block)
+            col_gas_used.append(gas_used)
+            col_gas_price.append(gas_price)
+            col_gas_limit.append(gas_limit)
+
+        block_data = _finish_records(col_token, col_hash, col_block,
+                                     col_gas_used, col_gas_price, col_gas_limit)
+
+        self.log.info(f"Found {len(block_data)} transfers in block {block}")
+        return block_data
+
+    async def collect_network_transfers(self, session, blocks, tokens_to_find):
+        """
+        Collect token transfers from network blocks for comparison.
+
+        Analyzes transactions in the same blocks where user transactions
+        occurred, processing all blocks concurrently (bounded by the
+        shared semaphore) to overlap API round trips.
+
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            blocks (list): List of block numbers to analyze
+            tokens_to_find (set): Set of token names to search for (e.g., {'eth', 'usdt'})
+
+        Returns:
+            list: List of network transaction dicts with same structure as user transactions
+        """
+        self.log.info(f"Searching for transfers in {len(blocks)} blocks...")
+        network_data = []
+
+        erc20_tokens = {name: self.tokens[name] for name in tokens_to_find
+                        if self._tokens_lower.get(name) != ZERO_ADDRESS}
+        native_tokens = {name for name in tokens_to_find
+                         if self._tokens_lower.get(name) == ZERO_ADDRESS}
+
+        if erc20_tokens:
+            # One tokentx history query per token covers every analyzed
+            # block and already includes gasUsed/gasPrice, replacing the
+            # per-block scan plus per-transaction receipt lookups.
+            block_set = set(blocks)
+            start_block, end_block = min(blocks), max(blocks)
+
+            token_histories = await asyncio.gather(*[
+                self.get_token_transfers(session, address, start_block, end_block)
+                for address in erc20_tokens.values()
+            ])
+
+            for token_name, rows in zip(erc20_tokens, token_histories):
+                per_block_counts = {}
+                col_token, col_hash, col_block = [], [], []
+                col_gas_used, col_gas_price, col_gas_limit = [], [], []
+
+                for row in rows:
+                    block_number = int(row.get("blockNumber", "0"))
+                    if block_number not in block_set:
+                        continue
+                    if row.get("from", "").lower() == self._my_address_lower:
+                        continue
+                    if per_block_counts.get(block_number, 0) >= self.max_network_examples:
+                        continue
+
+                    per_block_counts[block_number] = per_block_counts.get(block_number, 0) + 1
+                    col_token.append(token_name)
+                    col_hash.append(row.get("hash", ""))
+                    col_block.append(block_number)
+                    col_gas_used.append(int(row.get("gasUsed", "0")))
+                    col_gas_price.append(int(row.get("gasPrice", "0")))
+                    col_gas_limit.append(int(row.get("gas", "0")))
+
+                token_data = _finish_records(col_token, col_hash, col_block,
+                                             col_gas_used, col_gas_price, col_gas_limit)
+                self.log.info(f"Found {len(token_data)} {token_name} transfers in analyzed blocks")
+                network_data.extend(token_data)
+
+        if native_tokens:
+            # Native transfers are not covered by tokentx, so those blocks
+            # still go through the prefetched block scan. The dispatch
+            # tables are built once here, not per block: the address dict is
+            # empty because ERC-20 tokens are handled above.
+            native_token = next(iter(native_tokens))
+            blocks_cache = await self.get_blocks_batch(session, blocks)
+
+            block_results = await asyncio.gather(*[
+                self.process_block(session, block, blocks_cache.get(block, []), {}, native_token)
+                for block in blocks
+            ])
+
+            network_data.extend(transfer for block_data in block_results for transfer in block_data)
+
+        total_transfers = len(network_data)
+        self.log.info(f"Total transfers collected: {total_transfers}")
+
+        return network_data
+
+    def generate_report(self, my_stats, network_stats, data):
+        """
+        Generate comparison report table data.
+
+        Creates formatted table rows comparing user transactions with network averages,
+        including percentage differences for fees, gas limits, gas used, and gas prices.
+
+        Args:
+            my_stats (dict): Statistics for user transactions
+            network_stats (dict): Statistics for network transactions
+            data (dict): Original data with 'tokens_analyzed' list
+
+        Returns:
+            list: List of table rows, each row is a list of formatted strings
+        """
+        table_data = []
+
+        for token_name in data["tokens_analyzed"]:
+            my_data = my_stats.get(token_name, {})
+            network_data = network_stats.get(token_name, {})
+
+            if not my_data or not network_data:
+                continue
+
+            # Pull every average into a local once; the formatting below
+            # reuses them instead of repeating the .get chains
+            my_fee = my_data.get("avg_fee", 0)
+            my_gas_used = my_data.get("avg_gas_used", 0)
+            my_gas_limit = my_data.get("avg_gas_limit", 0)
+            my_gas_price = my_data.get("avg_gas_price", 0)
+
+            network_fee = network_data.get("avg_fee", 0)
+            network_gas_used = network_data.get("avg_gas_used", 0)
+            network_gas_limit = network_data.get("avg_gas_limit", 0)
+            network_gas_price = network_data.get("avg_gas_price", 0)
+
+            fee_diff_percent = ((my_fee - network_fee) / network_fee * 100) if network_fee > 0 else 0
+            gas_limit_diff_percent = ((my_gas_limit - network_gas_limit) / network_gas_limit * 100) if network_gas_limit > 0 else 0
+            gas_used_diff_percent = ((my_gas_used - network_gas_used) / network_gas_used * 100) if network_gas_used > 0 else 0
+            gas_price_diff_percent = ((my_gas_price - network_gas_price) / network_gas_price * 100) if network_gas_price > 0 else 0
+
+            table_data.append([
+                self.token_display_names.get(token_name, token_name),
+                my_data.get("count", 0),
+                f"{my_gas_used:.0f}",
+                f"{my_gas_limit:.0f}",
+                f"{my_gas_price * _GWEI_PER_WEI:.2f} Gwei",
+                f"{my_fee * _ETH_PER_WEI:.8f} {self.currency}",
+                network_data.get("count", 0),
+                f"{network_gas_used:.0f}",
+                f"{network_gas_limit:.0f}",
+                f"{network_gas_price * _GWEI_PER_WEI:.2f} Gwei",
+                f"{network_fee * _ETH_PER_WEI:.8f} {self.currency}",
+                f"{fee_diff_percent:+.2f}%",
+                f"{gas_limit_diff_percent:+.2f}%",
+                f"{gas_used_diff_percent:+.2f}%",
+                f"{gas_price_diff_percent:+.2f}%",
+            ])
+
+        return table_data
+
+    async def run(self):
+        """Run the full collection, analysis and reporting pipeline."""
+        if not self.my_address:
+            self.log.error(f"{self.display_name} address not configured. "
+                           f"Please set ADDRESSES['{self.network}'] in config/config.py")
+            return
+
+        if not self.api_key or self.api_key == "YOUR_ETHERSCAN_API_KEY_HERE":
+            self.log.error("Etherscan API key not configured. "
+                           "Please set ETHERSCAN_API_KEY in config/config.py")
+            return
+
+        self.log.info(f"Starting {self.display_name} transaction fee analyzer...")
+
+        # One pooled session for the whole run: connections are kept alive
+        # between calls so each request reuses an established TLS session
+        # instead of paying a fresh handshake.
+        connector = aiohttp.TCPConnector(limit=REQUEST_CONCURRENCY, keepalive_timeout=60)
+
+        async with aiohttp.ClientSession(connector=connector,
+                                         headers={"Accept-Encoding": "gzip"}) as session:
+            # Collect user transactions
+            my_transactions, blocks = await self.collect_my_transactions(session)
+
+            if not my_transactions:
+                self.log.warning("No user transactions found. Analysis cannot proceed.")
+                return
+
+            # Determine which tokens to search for in network
+            tokens_in_my_txs = set(tx["token"] for tx in my_transactions)
+            self.log.info(f"Searching for token transfers: {list(tokens_in_my_txs)}")
+
+            # Collect network transfers
+            network_data = await self.collect_network_transfers(session, blocks, tokens_in_my_txs)
+
+        # Prepare output data
+        output_data = {
+            "timestamp": datetime.now().isoformat(),
+            "network": self.display_name,
+            "my_address": self.my_address,
+            "settings": {
+                "max_my_transactions": self.max_my_transactions,
+                "max_network_examples": self.max_network_examples
+            },
+            "blocks_analyzed": blocks,
+            "tokens_analyzed": list(tokens_in_my_txs),
+            "my_transactions": my_transactions,
+            "network_transfers": network_data
+        }
+
+        # Save raw data
+        results_dir = os.path.join(os.path.dirname(__file__), '..', 'results')
+        os.makedirs(results_dir, exist_ok=True)
+        data_filename = os.path.join(
+            results_dir,
+            f"{self.network}_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+        _write_json(data_filename, output_data)
+
+        self.log.info(f"Data saved to {data_filename}")
+
+        # Analyze data
+        my_stats, network_stats = analyze_data(output_data)
+
+        # Generate report
+        headers = [
+            "Token", "My Tx", "Avg Gas Used", "Avg Gas Limit", "Avg Gas Price", "Avg Fee",
+            "Network Tx", "Avg Gas Used", "Avg Gas Limit", "Avg Gas Price", "Avg Fee",
+            "Fee Diff", "Gas Limit Diff", "Gas Used Diff", "Gas Price Diff"
+        ]
+
+        table_data = self.generate_report(my_stats, network_stats, output_data)
+
+        # Grid formatting is the expensive part of tabulate; render the
+        # table once and reuse it for stdout and the report file
+        rendered_table = tabulate(table_data, headers=headers, tablefmt="grid")
+
+        # Print results
+        print(f"\n{self.display_name} Transaction Fee Analysis - {output_data['timestamp']}")
+        print(f"Address: {output_data['my_address']}")
+        print(f"Settings: {output_data['settings']['max_my_transactions']} user tx/token, {output_data['settings']['max_network_examples']} examples/token")
+        print(f"Blocks analyzed: {len(output_data['blocks_analyzed'])}")
+        print(f"Tokens analyzed: {', '.join([self.token_display_names.get(t, t) for t in output_data['tokens_analyzed']])}")
+        print(f"User transactions: {len(output_data['my_transactions'])}")
+        print(f"Network transfers: {len(output_data['network_transfers'])}")
+        print()
+
+        print("Transaction Fee Analysis Results:")
+        print(rendered_table)
+
+        # Save report (written to a temp name and renamed, like the data file)
+        report_filename = data_filename.replace('.json', '_report.txt')
+        with open(report_filename + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(f"{self.display_name} Transaction Fee Analysis - {output_data['timestamp']}\n")
+            f.write(f"Address: {output_data['my_address']}\n")
+            f.write(f"Settings: {output_data['settings']['max_my_transactions']} user tx/token, {output_data['settings']['max_network_examples']} examples/token\n")
+            f.write(f"Blocks analyzed: {len(output_data['blocks_analyzed'])}\n")
+            f.write(f"Tokens analyzed: {', '.join([self.token_display_names.get(t, t) for t in output_data['tokens_analyzed']])}\n")
+            f.write(f"User transactions: {len(output_data['my_transactions'])}\n")
+            f.write(f"Network transfers: {len(output_data['network_transfers'])}\n\n")
+            f.write("Transaction Fee Analysis Results:\n")
+            f.write(rendered_table)
+        os.replace(report_filename + '.tmp', report_filename)
+
+        self.log.info(f"Report saved to {report_filename}")
+        self.log.info("Analysis complete!")
+
+    def main(self):
+        """Run the analyzer standalone in its own event loop."""
+        asyncio.run(self.run())
@@ -5,20 +5,30 @@ Collects and analyzes transaction fee data from Litecoin network.
 Compares your transaction fees with network averages.
 """
 
-import requests
-import time
-import json
+import aiohttp
+import asyncio
 import logging
 import os
 import sys
 import statistics
 from datetime import datetime
-from collections import defaultdict
 from tabulate import tabulate
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'config'))
 from config import ADDRESSES, SETTINGS, API_ENDPOINTS
 
+from _evm_base import RateLimiter, _cache_get, _cache_put, _loads
+
 log_dir = os.path.join(os.path.dirname(__file__), '..', 'results')
 os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, 'litecoin.log')
@@ -38,6 +48,49 @@ MAX_FEE = 8.0
 OUR_TRANSACTIONS_LIMIT = 20
 NETWORK_BLOCKS_LIMIT = 20
 
+# litecoinspace.org publishes no hard limit; stay at the polite pace the
+# old per-block sleep implied while overlapping the round trips
+REQUEST_CONCURRENCY = 5
+RATE_LIMIT_PER_SEC = 5
+
+# Litecoin rows in the shared on-disk cache are keyed by the SLIP-44
+# coin type, which can never collide with an EVM chain id
+CACHE_CHAIN_ID = 2
+
+# Blocks within this distance of the tip may still reorg; only deeper
+# blocks are cached on disk
+REORG_SAFETY_DEPTH = 6
+
+_rate_limiter = RateLimiter(RATE_LIMIT_PER_SEC)
+
+# Highest block height considered safe to cache; set once the current
+# chain height is known
+_safe_block_cutoff = None
+
+
+async def api_get(session, sem, url, as_text=False):
+    """
+    Perform a rate-limited GET against the Litecoin explorer API.
+
+    Args:
+        session (aiohttp.ClientSession): Shared HTTP session
+        sem (asyncio.Semaphore): Semaphore bounding concurrent requests
+        url (str): Full request URL
+        as_text (bool): Return the raw body text instead of decoded JSON
+
+    Returns:
+        dict, list or str: Decoded JSON response body, or text
+    """
+    await _rate_limiter.acquire()
+    async with sem:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            if as_text:
+                return (await response.text()).strip()
+            # orjson when available, stdlib json otherwise; the per-block
+            # tx payloads are the biggest decode cost in this module
+            return _loads(await response.read())
+
 
 def calculate_fee_per_byte(tx):
     """Calculate fee per byte using vsize."""
@@ -60,190 +113,298 @@ def is_cpfp_transaction(tx):
     return False
 
 
-def get_blockchain_info():
+async def get_blockchain_info(session, sem):
     """Get current blockchain height."""
+    global _safe_block_cutoff
     url = f"{LTC_API_BASE}/blockchain/status"
     try:
-        response = requests.get(url, timeout=30)
-        if response.status_code == 200:
-            return response.json()
+        info = await api_get(session, sem, url)
+        if info and 'blocks' in info:
+            _safe_block_cutoff = info['blocks'] - REORG_SAFETY_DEPTH
+        return info
     except Exception as e:
         logging.error(f"Error retrieving blockchain info: {e}")
     return None
 
 
-def get_recent_blocks(limit=20):
+async def get_recent_blocks(session, sem, limit=20):
     """Get recent blocks."""
-    blockchain_info = get_blockchain_info()
+    blockchain_info = await get_blockchain_info(session, sem)
     if not blockchain_info:
         url = f"{LTC_API_BASE}/blocks"
         try:
-            response = requests.get(url, timeout=30)
-            if response.status_code == 200:
-                blocks = response.json()
-                return [block['height'] for block in blocks[:limit]]
+            blocks = await api_get(session, sem, url)
+            return [block['height'] for block in blocks[:limit]]
         except Exception as e:
             logging.error(f"Error retrieving blocks: {e}")
         return []
-    
+
     current_height = blockchain_info['blocks']
     start_height = max(1, current_height - limit + 1)
     return list(range(start_height, current_height + 1))
 
 
-def get_block_transactions(block_height):
-    """Get all transactions in a block."""
+async def get_block_transactions(session, sem, block_height):
+    """
+    Get all transactions in a block.
+
+    Blocks buried deeper than REORG_SAFETY_DEPTH are immutable, so they
+    are served from the shared on-disk cache on repeat runs.
+    """
+    cached = _cache_get(CACHE_CHAIN_ID, "blocks", "number", block_height)
+    if cached is not None:
+        return cached
+
     hash_url = f"{LTC_API_BASE}/block-height/{block_height}"
     try:
-        response = requests.get(hash_url, timeout=30)
-        if response.status_code == 200:
-            block_hash = response.text.strip()
-            txs_url = f"{LTC_API_BASE}/block/{block_hash}/txs"
-            response = requests.get(txs_url, timeout=30)
-            if response.status_code == 200:
-                return response.json()
+        block_hash = await api_get(session, sem, hash_url, as_text=True)
+        txs_url = f"{LTC_API_BASE}/block/{block_hash}/txs"
+        transactions = await api_get(session, sem, txs_url)
+        if (transactions and _safe_block_cutoff is not None and
+                block_height <= _safe_block_cutoff):
+            _cache_put(CACHE_CHAIN_ID, "blocks", "number", block_height, transactions)
+        return transactions
     except Exception as e:
         logging.error(f"Error retrieving block {block_height}: {e}")
     return []
 
 
-def get_our_transactions_stats():
+async def get_our_transactions_stats(session, sem):
     """Get statistics for user transactions."""
     logging.info("Analyzing user transactions...")
-    
+
     if not MY_ADDRESS:
         logging.warning("Litecoin address not configured")
         return None
-    
+
     url = f"{LTC_API_BASE}/address/{MY_ADDRESS}/txs"
     try:
-        response = requests.get(url, timeout=30)
-        if response.status_code == 200:
-            our_txs = response.json()[:OUR_TRANSACTIONS_LIMIT]
-            
-            fees = []
-            sizes = []
-            weights = []
-            inputs = []
-            outputs = []
-            
-            for tx in our_txs:
-                if not tx.get('status', {}).get('confirmed', False):
-                    continue
-                    
-                fee_per_byte, vsize = calculate_fee_per_byte(tx)
-                fees.append(fee_per_byte)
-                sizes.append(tx.get('size', 0))
-                weights.append(tx.get('weight', 0))
-                inputs.append(len(tx.get('vin', [])))
-                outputs.append(len(tx.get('vout', [])))
-            
-            if not fees:
-                logging.warning("No confirmed transactions found")
-                return None
-            
+        our_txs = (await api_get(session, sem, url))[:OUR_TRANSACTIONS_LIMIT]
+
+        rows = []
+        for tx in our_txs:
+            if not tx.get('status', {}).get('confirmed', False):
+                continue
+
+            fee_per_byte, vsize = calculate_fee_per_byte(tx)
+            rows.append((fee_per_byte, tx.get('size', 0), tx.get('weight', 0),
+                         len(tx.get('vin', [])), len(tx.get('vout', []))))
+
+        if not rows:
+            logging.warning("No confirmed transactions found")
+            return None
+
+        if np is not None:
+            # All five medians come from one introselect pass over a
+            # contiguous array instead of five pure-Python sorts
+            med = np.median(np.asarray(rows, dtype=np.float64), axis=0)
             return {
-                'avg_fee_per_byte': statistics.median(fees),
-                'avg_size': statistics.median(sizes),
-                'avg_weight': statistics.median(weights),
-                'avg_inputs': statistics.median(inputs),
-                'avg_outputs': statistics.median(outputs),
-                'total_txs': len(fees)
+                'avg_fee_per_byte': float(med[0]),
+                'avg_size': float(med[1]),
+                'avg_weight': float(med[2]),
+                'avg_inputs': float(med[3]),
+                'avg_outputs': float(med[4]),
+                'total_txs': len(rows)
             }
+
+        fees, sizes, weights, inputs, outputs = zip(*rows)
+        return {
+            'avg_fee_per_byte': statistics.median(fees),
+            'avg_size': statistics.median(sizes),
+            'avg_weight': statistics.median(weights),
+            'avg_inputs': statistics.median(inputs),
+            'avg_outputs': statistics.median(outputs),
+            'total_txs': len(rows)
+        }
     except Exception as e:
         logging.error(f"Error retrieving user transactions: {e}")
-    
+
     return None
 
 
-def analyze_network_transactions():
+def _filter_network_transactions_python(transactions):
+    """Per-dict fallback for the block scan when NumPy is missing."""
+    kept = []
+    for tx in transactions:
+        if any(vin.get('is_coinbase', False) for vin in tx.get('vin', [])):
+            continue
+
+        if is_cpfp_transaction(tx):
+            continue
+
+        fee_per_byte, vsize = calculate_fee_per_byte(tx)
+
+        if 0 < fee_per_byte <= MAX_FEE:
+            kept.append({
+                'fee_per_byte': fee_per_byte,
+                'size': tx.get('size', 0),
+                'weight': tx.get('weight', 0),
+                'inputs': len(tx.get('vin', [])),
+                'outputs': len(tx.get('vout', [])),
+                'vsize': vsize
+            })
+    return kept
+
+
+def _filter_network_transactions(transactions):
+    """
+    Classify and filter one block's transactions.
+
+    A single Python pass pulls the numeric fields out of the tx dicts;
+    the coinbase, CPFP and fee-band tests then run as NumPy boolean
+    masks over parallel float64 columns, so the arithmetic of a whole
+    block is done at C speed instead of per-dict in the interpreter.
+
+    Args:
+        transactions (list): Transaction dicts of one block
+
+    Returns:
+        list: Filtered transaction dicts in the analyzer's field layout
+    """
+    if np is None or not transactions:
+        return _filter_network_transactions_python(transactions)
+
+    columns = []
+    for tx in transactions:
+        vin = tx.get('vin', [])
+        columns.append((
+            tx.get('fee', 0),
+            tx.get('size', 0),
+            tx.get('weight', 0),
+            len(vin),
+            len(tx.get('vout', [])),
+            any(v.get('is_coinbase', False) for v in vin)
+        ))
+
+    fee, size, weight, vins, vouts, coinbase = \
+        np.asarray(columns, dtype=np.float64).T
+
+    # Same arithmetic as calculate_fee_per_byte / is_cpfp_transaction,
+    # evaluated for every transaction at once
+    vsize = np.where(weight > 0, weight / 4, size)
+    fee_per_byte = np.divide(fee, vsize, out=np.zeros_like(fee), where=vsize > 0)
+    cpfp = (vins > 5) & (fee_per_byte < 2.0)
+    keep = (coinbase == 0) & ~cpfp & (fee_per_byte > 0) & (fee_per_byte <= MAX_FEE)
+
+    return [
+        {
+            'fee_per_byte': float(fee_per_byte[i]),
+            'size': int(size[i]),
+            'weight': int(weight[i]),
+            'inputs': int(vins[i]),
+            'outputs': int(vouts[i]),
+            'vsize': float(vsize[i])
+        }
+        for i in np.flatnonzero(keep)
+    ]
+
+
+async def analyze_network_transactions(session, sem):
     """Analyze network transactions."""
     logging.info("Analyzing network transactions...")
-    
-    recent_blocks = get_recent_blocks(NETWORK_BLOCKS_LIMIT)
-    logging.info(f"Analyzing {len(recent_blocks)} blocks: from {min(recent_blocks)} to {max(recent_blocks)}")
-    
+
+    recent_blocks = await get_recent_blocks(session, sem, NETWORK_BLOCKS_LIMIT)
+    if not recent_blocks:
+        logging.warning("No recent blocks retrieved")
+        return []
+
+    # min/max rather than first/last entries: the normal path returns an
+    # ascending range, but the /blocks fallback yields heights
+    # newest-first, and the list is at most ~20 items anyway
+    total_blocks = len(recent_blocks)
+    logging.info("Analyzing %s blocks: from %s to %s",
+                 total_blocks, min(recent_blocks), max(recent_blocks))
+
+    # All block fetches run concurrently (bounded by the semaphore and
+    # the rate limiter) instead of one request plus a sleep per block
+    block_txs = await asyncio.gather(*[
+        get_block_transactions(session, sem, block_height)
+        for block_height in recent_blocks
+    ])
+
     network_transactions = []
     total_blocks_processed = 0
-    
-    for i, block_height in enumerate(recent_blocks):
-        transactions = get_block_transactions(block_height)
-        
+
+    for block_height, transactions in zip(recent_blocks, block_txs):
         if not transactions:
             continue
-            
-        for tx in transactions:
-            if any(vin.get('is_coinbase', False) for vin in tx.get('vin', [])):
-                continue
-            
-            if is_cpfp_transaction(tx):
-                continue
-            
-            fee_per_byte, vsize = calculate_fee_per_byte(tx)
-            
-            if 0 < fee_per_byte <= MAX_FEE:
-                network_transactions.append({
-                    'fee_per_byte': fee_per_byte,
-                    'size': tx.get('size', 0),
-                    'weight': tx.get('weight', 0),
-                    'inputs': len(tx.get('vin', [])),
-                    'outputs': len(tx.get('vout', [])),
-                    'vsize': vsize
-                })
-        
+
+        network_transactions.extend(_filter_network_transactions(transactions))
+
         total_blocks_processed += 1
         if total_blocks_processed % 5 == 0:
-            logging.info(f"Processed {total_blocks_processed}/{len(recent_blocks)} blocks, found {len(network_transactions)} transactions")
-        
-        time.sleep(0.2)
-    
-    logging.info(f"Processed blocks: {total_blocks_processed}/{len(recent_blocks)}")
+            logging.info("Processed %s/%s blocks, found %s transactions",
+                         total_blocks_processed, total_blocks, len(network_transactions))
+
+    logging.info("Processed blocks: %s/%s", total_blocks_processed, total_blocks)
     return network_transactions
 
 
-def main():
-    """Main execution function."""
+async def main_async():
+    """Main execution coroutine."""
     if not MY_ADDRESS:
         logging.error("Litecoin address not configured. Please set ADDRESSES['litecoin'] in config/config.py")
         return
-    
+
     logging.info("Starting Litecoin transaction fee analyzer...")
-    
-    our_stats = get_our_transactions_stats()
-    if not our_stats:
-        logging.warning("Could not retrieve user transaction statistics")
-        return
-    
-    logging.info(f"Analyzed {our_stats['total_txs']} user transactions")
-    
-    network_txs = analyze_network_transactions()
+
+    sem = asyncio.Semaphore(REQUEST_CONCURRENCY)
+    # One pooled session for the whole run: connections are kept alive
+    # between calls so each request reuses an established TLS session
+    # instead of paying a fresh handshake.
+    connector = aiohttp.TCPConnector(limit=REQUEST_CONCURRENCY, keepalive_timeout=60)
+
+    async with aiohttp.ClientSession(connector=connector,
+                                     headers={"Accept-Encoding": "gzip"}) as session:
+        our_stats = await get_our_transactions_stats(session, sem)
+        if not our_stats:
+            logging.warning("Could not retrieve user transaction statistics")
+            return
+
+        logging.info(f"Analyzed {our_stats['total_txs']} user transactions")
+
+        network_txs = await analyze_network_transactions(session, sem)
+
     logging.info(f"Analyzed {len(network_txs)} network transactions")
-    
+
     if not network_txs:
         logging.warning("No network transactions found for comparison")
         return
-    
-    network_fees = [tx['fee_per_byte'] for tx in network_txs]
-    network_sizes = [tx['size'] for tx in network_txs]
-    network_weights = [tx['weight'] for tx in network_txs]
-    network_inputs = [tx['inputs'] for tx in network_txs]
-    network_outputs = [tx['outputs'] for tx in network_txs]
-    network_vsizes = [tx['vsize'] for tx in network_txs]
-    
-    network_stats = {
-        'avg_fee_per_byte': statistics.median(network_fees),
-        'avg_size': statistics.median(network_sizes),
-        'avg_weight': statistics.median(network_weights),
-        'avg_inputs': statistics.median(network_inputs),
-        'avg_outputs': statistics.median(network_outputs),
-        'avg_vsize': statistics.median(network_vsizes)
-    }
-    
+
+    if pd is not None:
+        # One C-level median pass over contiguous columns instead of six
+        # list comprehensions plus six pure-Python medians
+        medians = pd.DataFrame(network_txs).median()
+        network_stats = {
+            'avg_fee_per_byte': float(medians['fee_per_byte']),
+            'avg_size': float(medians['size']),
+            'avg_weight': float(medians['weight']),
+            'avg_inputs': float(medians['inputs']),
+            'avg_outputs': float(medians['outputs']),
+            'avg_vsize': float(medians['vsize'])
+        }
+    else:
+        network_fees = [tx['fee_per_byte'] for tx in network_txs]
+        network_sizes = [tx['size'] for tx in network_txs]
+        network_weights = [tx['weight'] for tx in network_txs]
+        network_inputs = [tx['inputs'] for tx in network_txs]
+        network_outputs = [tx['outputs'] for tx in network_txs]
+        network_vsizes = [tx['vsize'] for tx in network_txs]
+
+        network_stats = {
+            'avg_fee_per_byte': statistics.median(network_fees),
+            'avg_size': statistics.median(network_sizes),
+            'avg_weight': statistics.median(network_weights),
+            'avg_inputs': statistics.median(network_inputs),
+            'avg_outputs': statistics.median(network_outputs),
+            'avg_vsize': statistics.median(network_vsizes)
+        }
+
     comparison_table = []
-    
+
     fee_diff = our_stats['avg_fee_per_byte'] - network_stats['avg_fee_per_byte']
     fee_diff_percent = (fee_diff / network_stats['avg_fee_per_byte']) * 100 if network_stats['avg_fee_per_byte'] > 0 else 0
-    
+
     comparison_table.append([
         "Fee (lit/vB)",
         f"{our_stats['avg_fee_per_byte']:.2f}",
@@ -251,10 +412,10 @@ def main():
         f"{fee_diff:+.2f}",
         f"{fee_diff_percent:+.1f}%"
     ])
-    
+
     size_diff = our_stats['avg_size'] - network_stats['avg_size']
     size_diff_percent = (size_diff / network_stats['avg_size']) * 100 if network_stats['avg_size'] > 0 else 0
-    
+
     comparison_table.append([
         "Size (bytes)",
         f"{our_stats['avg_size']:.0f}",
@@ -262,11 +423,11 @@ def main():
         f"{size_diff:+.0f}",
         f"{size_diff_percent:+.1f}%"
     ])
-    
+
     our_vsize = our_stats['avg_weight'] / 4
     vsize_diff = our_vsize - network_stats['avg_vsize']
     vsize_diff_percent = (vsize_diff / network_stats['avg_vsize']) * 100 if network_stats['avg_vsize'] > 0 else 0
-    
+
     comparison_table.append([
         "Virtual Size (vB)",
         f"{our_vsize:.1f}",
@@ -274,10 +435,10 @@ def main():
         f"{vsize_diff:+.1f}",
         f"{vsize_diff_percent:+.1f}%"
     ])
-    
+
     inputs_diff = our_stats['avg_inputs'] - network_stats['avg_inputs']
     inputs_diff_percent = (inputs_diff / network_stats['avg_inputs']) * 100 if network_stats['avg_inputs'] > 0 else 0
-    
+
     comparison_table.append([
         "Inputs",
         f"{our_stats['avg_inputs']:.1f}",
@@ -285,10 +446,10 @@ def main():
         f"{inputs_diff:+.1f}",
         f"{inputs_diff_percent:+.1f}%"
     ])
-    
+
     outputs_diff = our_stats['avg_outputs'] - network_stats['avg_outputs']
     outputs_diff_percent = (outputs_diff / network_stats['avg_outputs']) * 100 if network_stats['avg_outputs'] > 0 else 0
-    
+
     comparison_table.append([
         "Outputs",
         f"{our_stats['avg_outputs']:.1f}",
@@ -296,32 +457,38 @@ def main():
         f"{outputs_diff:+.1f}",
         f"{outputs_diff_percent:+.1f}%"
     ])
-    
+
     headers = ["Parameter", "User", "Network", "Diff", "Diff %"]
+    # Render the grid once and reuse it for stdout and the report file
+    rendered_table = tabulate(comparison_table, headers=headers, tablefmt="grid")
     print("\nLitecoin Transaction Fee Analysis")
     print(f"Address: {MY_ADDRESS}")
     print(f"User transactions analyzed: {our_stats['total_txs']}")
     print(f"Network transactions analyzed: {len(network_txs)}")
     print()
     print("Comparison Table:")
-    print(tabulate(comparison_table, headers=headers, tablefmt="grid"))
-    
+    print(rendered_table)
+
     results_dir = os.path.join(os.path.dirname(__file__), '..', 'results')
     os.makedirs(results_dir, exist_ok=True)
     report_filename = os.path.join(results_dir, f"litecoin_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-    
+
     with open(report_filename, 'w', encoding='utf-8') as f:
         f.write(f"Litecoin Transaction Fee Analysis - {datetime.now().isoformat()}\n")
         f.write(f"Address: {MY_ADDRESS}\n")
         f.write(f"User transactions analyzed: {our_stats['total_txs']}\n")
         f.write(f"Network transactions analyzed: {len(network_txs)}\n\n")
         f.write("Comparison Table:\n")
-        f.write(tabulate(comparison_table, headers=headers, tablefmt="grid"))
-    
+        f.write(rendered_table)
+
     logging.info(f"Report saved to {report_filename}")
     logging.info("Analysis complete!")
 
 
+def main():
+    """Main execution function."""
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()
-
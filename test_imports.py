@@ -0,0 +1,15 @@
+"""
+Launcher for the import test: python test_imports.py [--deep]
+
+The checks live in _test_imports.py because CPython only caches
+compiled bytecode for imported modules, not for the __main__ script;
+keeping this entry point tiny means only these few lines are re-parsed
+on every run.
+"""
+
+import sys
+
+from _test_imports import main
+
+if __name__ == "__main__":
+    sys.exit(main())